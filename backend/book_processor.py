@@ -1,20 +1,136 @@
 """Book processor using Gemini File API for direct document understanding."""
 
+import asyncio
+import functools
+import hashlib
 import os
-import tempfile
-from typing import Optional, Dict, Any
+import time
+from dataclasses import dataclass
+from typing import AsyncIterator, Awaitable, Optional, Dict, Any, List, Tuple, Union
 
+import aiofiles.os
+import aiofiles.tempfile
+import aiohttp
+from google import genai
+from google.genai import types
 from loguru import logger
 
+from pipecat.adapters.services.gemini_adapter import GeminiLLMAdapter
 from pipecat.services.google.gemini_live.file_api import GeminiFileAPI
 
+from llm_config import LLM_MODEL, SYSTEM_PROMPT_WITH_FILE, TOOLS
+
+
+@functools.lru_cache(maxsize=1)
+def get_cache_tools() -> List[Dict[str, Any]]:
+    """Get the tools in Gemini's wire format, for context caches."""
+    return GeminiLLMAdapter().to_provider_tools_format(TOOLS)
+
+
+class StreamingFileAPI(GeminiFileAPI):
+    """Gemini File API client that can also upload without a file on disk."""
+
+    async def upload_bytes(
+        self,
+        data: Union[bytes, AsyncIterator[bytes]],
+        size: int,
+        mime_type: str,
+        display_name: str,
+    ) -> Dict[str, Any]:
+        """Upload file contents using the resumable upload protocol.
+
+        Args:
+            data: File contents, either in memory or as an async byte stream.
+            size: Total size of the contents in bytes.
+            mime_type: Mime type of the file.
+            display_name: Display name for the uploaded file.
+
+        Returns:
+            File info dict, in the same shape as upload_file().
+        """
+        async with aiohttp.ClientSession() as session:
+            # Start a resumable upload session
+            start_headers = {
+                "X-Goog-Upload-Protocol": "resumable",
+                "X-Goog-Upload-Command": "start",
+                "X-Goog-Upload-Header-Content-Length": str(size),
+                "X-Goog-Upload-Header-Content-Type": mime_type,
+                "Content-Type": "application/json",
+            }
+            async with session.post(
+                self.upload_base_url,
+                params={"key": self._api_key},
+                headers=start_headers,
+                json={"file": {"display_name": display_name}},
+            ) as response:
+                if response.status != 200:
+                    raise RuntimeError(f"Failed to start upload: {await response.text()}")
+                upload_url = response.headers["X-Goog-Upload-URL"]
+
+            # Send the contents and finalize in a single request
+            upload_headers = {
+                "Content-Length": str(size),
+                "X-Goog-Upload-Offset": "0",
+                "X-Goog-Upload-Command": "upload, finalize",
+            }
+            async with session.post(upload_url, headers=upload_headers, data=data) as response:
+                if response.status != 200:
+                    raise RuntimeError(f"Failed to upload file: {await response.text()}")
+                return await response.json()
+
+
+@dataclass
+class SharedUpload:
+    """A Gemini upload shared by every session that uploaded the same bytes."""
+
+    digest: str
+    file_info: Dict[str, Any]
+    mime_type: str
+    cache_name: Optional[str]
+    cache_expires_at: float
+    uploaded_at: float
+    refs: int = 1
+
+
+# Uploads keyed by the SHA-256 of their contents
+shared_uploads: Dict[str, SharedUpload] = {}
+
 
 class BookProcessor:
-    """Handles book upload via Gemini File API."""
+    """Handles book upload via Gemini File API.
+
+    Identical files are uploaded once: uploads are keyed by content hash and
+    reference counted, and Gemini copies are deleted when the last session
+    using them clears its book.
+    """
 
     # Max file size: 10MB (Gemini supports up to 2GB but we limit for reasonable response times)
     MAX_FILE_SIZE = 10 * 1024 * 1024
 
+    # Read size used when streaming uploads
+    CHUNK_SIZE = 1 << 20
+
+    # Supported file extensions and their mime types
+    SUPPORTED_TYPES = {
+        ".pdf": "application/pdf",
+        ".txt": "text/plain",
+    }
+
+    # Gemini rejects caches under ~2048 tokens; smaller files are sent inline instead
+    CACHE_MIN_SIZE = 8 * 1024
+
+    # Lifetime of the cached prompt, refreshed whenever a new connection uses it
+    CACHE_TTL_SECONDS = 3600
+
+    # Don't hand out a cache that may expire mid-conversation
+    CACHE_MIN_REMAINING_SECONDS = 15 * 60
+
+    # How often an open conversation extends the context cache, well inside its TTL
+    CACHE_REFRESH_INTERVAL_SECONDS = 10 * 60
+
+    # Gemini deletes uploaded files after 48 hours, so stop sharing them before then
+    SHARED_UPLOAD_MAX_AGE_SECONDS = 47 * 3600
+
     def __init__(self, api_key: str = None):
         """Initialize the book processor.
 
@@ -23,23 +139,37 @@ class BookProcessor:
         """
         self.api_key = api_key or os.getenv("GOOGLE_API_KEY")
         self._file_api = None
+        self._genai_client = None
         self.file_info: Optional[Dict[str, Any]] = None
         self.file_uri: Optional[str] = None
         self.mime_type: Optional[str] = None
         self.book_title: Optional[str] = None
         self._temp_file_path: Optional[str] = None
+        self.cache_name: Optional[str] = None
+        self._cache_expires_at: float = 0.0
+        self._shared_upload: Optional[SharedUpload] = None
 
     @property
-    def file_api(self) -> GeminiFileAPI:
+    def file_api(self) -> StreamingFileAPI:
         """Lazy initialization of Gemini File API client."""
         if self._file_api is None:
             if not self.api_key:
                 raise ValueError("GOOGLE_API_KEY is required for file uploads")
-            self._file_api = GeminiFileAPI(api_key=self.api_key)
+            self._file_api = StreamingFileAPI(api_key=self.api_key)
         return self._file_api
 
+    @property
+    def genai_client(self) -> genai.Client:
+        """Lazy initialization of the Gemini client used for context caching."""
+        if self._genai_client is None:
+            self._genai_client = genai.Client(api_key=self.api_key)
+        return self._genai_client
+
     async def process_file(self, file_content: bytes, filename: str) -> Dict[str, Any]:
-        """Process an uploaded file by uploading to Gemini File API.
+        """Process an in-memory file by uploading to Gemini File API.
+
+        The server streams uploads through process_stream(); this is kept for
+        callers that already hold the whole file in memory.
 
         Args:
             file_content: Raw bytes of the uploaded file.
@@ -48,51 +178,282 @@ class BookProcessor:
         Returns:
             Dict with file_uri, mime_type, and filename.
         """
-        # Validate file size
-        if len(file_content) > self.MAX_FILE_SIZE:
-            raise ValueError(f"File too large. Max size is {self.MAX_FILE_SIZE // (1024*1024)}MB")
+        self._check_size(len(file_content))
+        _, mime_type = self._get_file_type(filename)
+        await self._clear_previous()
 
-        # Validate file type
-        if not (filename.lower().endswith(".pdf") or filename.lower().endswith(".txt")):
-            raise ValueError("Only PDF and TXT files are supported")
+        digest = hashlib.sha256(file_content).hexdigest()
+        if self._reuse_upload(digest, filename):
+            return self._result(filename)
 
-        self.book_title = filename
+        return await self._upload(
+            filename,
+            mime_type,
+            len(file_content),
+            digest,
+            self.file_api.upload_bytes(file_content, len(file_content), mime_type, filename),
+        )
+
+    async def process_stream(
+        self,
+        chunks: AsyncIterator[bytes],
+        filename: str,
+        size: Optional[int] = None,
+        digest: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Upload a streamed file to Gemini File API.
 
-        # Determine mime type
-        if filename.lower().endswith(".pdf"):
-            self.mime_type = "application/pdf"
-        else:
-            self.mime_type = "text/plain"
+        When the size is known up front the stream goes straight to Gemini,
+        unless the digest matches a file already uploaded. Otherwise it is
+        spooled to a temp file first, hashed and size-checked while streaming
+        so oversized uploads fail before being read in full. Starlette always
+        sets the size of multipart uploads, so the server never spools; the
+        spool path is a fallback for streams of unknown length.
+
+        Args:
+            chunks: Async iterator over the raw bytes of the uploaded file.
+            filename: Name of the uploaded file.
+            size: Total size in bytes, if known.
+            digest: SHA-256 hex digest of the contents, if known.
+
+        Returns:
+            Dict with file_uri, mime_type, and filename.
+        """
+        suffix, mime_type = self._get_file_type(filename)
+
+        if size is not None:
+            self._check_size(size)
+            await self._clear_previous()
+            if digest and self._reuse_upload(digest, filename):
+                return self._result(filename)
+            return await self._upload(
+                filename,
+                mime_type,
+                size,
+                digest,
+                self.file_api.upload_bytes(chunks, size, mime_type, filename),
+            )
 
         # Save to temp file for upload
-        suffix = ".pdf" if filename.lower().endswith(".pdf") else ".txt"
-        with tempfile.NamedTemporaryFile(mode="wb", suffix=suffix, delete=False) as f:
-            f.write(file_content)
-            self._temp_file_path = f.name
+        size = 0
+        hasher = hashlib.sha256()
+        # Writes go through aiofiles' thread pool so disk flushes don't block the event loop
+        async with aiofiles.tempfile.NamedTemporaryFile(mode="wb", suffix=suffix, delete=False) as f:
+            path = f.name
+            try:
+                async for chunk in chunks:
+                    size += len(chunk)
+                    self._check_size(size)
+                    hasher.update(chunk)
+                    await f.write(chunk)
+            except BaseException:
+                await f.close()
+                await aiofiles.os.remove(path)
+                raise
+
+        return await self.process_path(path, filename, digest=hasher.hexdigest())
+
+    async def process_path(self, path: str, filename: str, digest: Optional[str] = None) -> Dict[str, Any]:
+        """Upload a file already on disk to Gemini File API.
+
+        Used by the spool fallback of process_stream(). Once validated, the
+        processor owns the file and deletes it on clear().
+
+        Args:
+            path: Path to the file on disk.
+            filename: Name of the uploaded file.
+            digest: SHA-256 hex digest of the contents, if known.
+
+        Returns:
+            Dict with file_uri, mime_type, and filename.
+        """
+        _, mime_type = self._get_file_type(filename)
+        await self._clear_previous()
+        self._temp_file_path = path
+        if digest and self._reuse_upload(digest, filename):
+            return self._result(filename)
+        size = (await aiofiles.os.stat(path)).st_size
+
+        return await self._upload(
+            filename,
+            mime_type,
+            size,
+            digest,
+            self.file_api.upload_file(path, display_name=filename),
+        )
+
+    async def _clear_previous(self):
+        """Release the book this processor already holds before taking a new one."""
+        if self.has_file() or self._temp_file_path:
+            await self.clear()
+
+    def _check_size(self, size: int):
+        """Raise if the file exceeds the size limit."""
+        if size > self.MAX_FILE_SIZE:
+            raise ValueError(f"File too large. Max size is {self.MAX_FILE_SIZE // (1024*1024)}MB")
+
+    def _get_file_type(self, filename: str) -> Tuple[str, str]:
+        """Validate the file type and return its extension and mime type."""
+        suffix = os.path.splitext(filename)[1].lower()
+        mime_type = self.SUPPORTED_TYPES.get(suffix)
+        if mime_type is None:
+            raise ValueError("Only PDF and TXT files are supported")
+        return suffix, mime_type
+
+    async def _upload(
+        self,
+        filename: str,
+        mime_type: str,
+        size: int,
+        digest: Optional[str],
+        upload: Awaitable[Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        """Run a File API upload, record the result, and cache the prompt prefix."""
+        self.book_title = filename
+        self.mime_type = mime_type
 
         try:
             # Upload to Gemini File API
             logger.info(f"Uploading '{filename}' to Gemini File API...")
-            self.file_info = await self.file_api.upload_file(
-                self._temp_file_path,
-                display_name=filename,
-            )
+            self.file_info = await upload
 
             self.file_uri = self.file_info["file"]["uri"]
             logger.info(f"File uploaded successfully: {self.file_uri}")
 
-            return {
-                "file_uri": self.file_uri,
-                "mime_type": self.mime_type,
-                "filename": filename,
-                "file_name": self.file_info["file"]["name"],
-            }
+            if size >= self.CACHE_MIN_SIZE:
+                await self._create_cache()
+
+            # Share with later uploads of the same file (a concurrent duplicate may have won)
+            if digest and digest not in shared_uploads:
+                self._shared_upload = SharedUpload(
+                    digest=digest,
+                    file_info=self.file_info,
+                    mime_type=self.mime_type,
+                    cache_name=self.cache_name,
+                    cache_expires_at=self._cache_expires_at,
+                    uploaded_at=time.monotonic(),
+                )
+                shared_uploads[digest] = self._shared_upload
+
+            return self._result(filename)
 
         except Exception as e:
             logger.error(f"Failed to upload file: {e}")
             await self.clear()
             raise
 
+    def _reuse_upload(self, digest: str, filename: str) -> bool:
+        """Adopt an existing upload of the same contents, if one is still fresh."""
+        shared = shared_uploads.get(digest)
+        if shared is None:
+            return False
+        if time.monotonic() - shared.uploaded_at > self.SHARED_UPLOAD_MAX_AGE_SECONDS:
+            # Stop sharing it; sessions already holding it still release it normally
+            del shared_uploads[digest]
+            return False
+
+        shared.refs += 1
+        self._shared_upload = shared
+        self.book_title = filename
+        self.mime_type = shared.mime_type
+        self.file_info = shared.file_info
+        self.file_uri = shared.file_info["file"]["uri"]
+        self.cache_name = shared.cache_name
+        self._cache_expires_at = shared.cache_expires_at
+        logger.info(f"Reusing existing upload for '{filename}': {self.file_uri}")
+        return True
+
+    def _release_upload(self) -> bool:
+        """Drop this processor's reference to its upload.
+
+        Returns:
+            True if the Gemini file and cache should be deleted, False if
+            other sessions still use them.
+        """
+        shared = self._shared_upload
+        if shared is None:
+            return True
+
+        self._shared_upload = None
+        shared.refs -= 1
+        if shared.refs > 0:
+            return False
+        if shared_uploads.get(shared.digest) is shared:
+            del shared_uploads[shared.digest]
+        return True
+
+    def _result(self, filename: str) -> Dict[str, Any]:
+        """Describe the current upload."""
+        return {
+            "file_uri": self.file_uri,
+            "mime_type": self.mime_type,
+            "filename": filename,
+            "file_name": self.file_info["file"]["name"],
+            "cache_name": self.cache_name,
+        }
+
+    async def _create_cache(self):
+        """Cache the system prompt, tools, and document as a Gemini context.
+
+        Sessions for this book then send only the conversation each turn. On
+        failure the book is sent inline as before.
+        """
+        try:
+            cache = await self.genai_client.aio.caches.create(
+                model=LLM_MODEL,
+                config=types.CreateCachedContentConfig(
+                    display_name=self.book_title,
+                    system_instruction=SYSTEM_PROMPT_WITH_FILE,
+                    contents=[
+                        types.Content(
+                            role="user",
+                            parts=[types.Part.from_uri(file_uri=self.file_uri, mime_type=self.mime_type)],
+                        )
+                    ],
+                    tools=get_cache_tools(),
+                    ttl=f"{self.CACHE_TTL_SECONDS}s",
+                ),
+            )
+            self.cache_name = cache.name
+            self._cache_expires_at = time.monotonic() + self.CACHE_TTL_SECONDS
+            logger.info(f"Created context cache: {self.cache_name}")
+        except Exception as e:
+            logger.warning(f"Failed to create context cache, sending file inline: {e}")
+
+    async def refresh_cache(self):
+        """Extend the context cache lifetime by another CACHE_TTL_SECONDS."""
+        if not self.cache_name:
+            return
+        try:
+            await self.genai_client.aio.caches.update(
+                name=self.cache_name,
+                config=types.UpdateCachedContentConfig(ttl=f"{self.CACHE_TTL_SECONDS}s"),
+            )
+            self._cache_expires_at = time.monotonic() + self.CACHE_TTL_SECONDS
+            if self._shared_upload is not None:
+                self._shared_upload.cache_expires_at = self._cache_expires_at
+        except Exception as e:
+            logger.warning(f"Failed to refresh context cache: {e}")
+
+    async def keep_cache_alive(self):
+        """Refresh the context cache periodically until cancelled or the book is cleared.
+
+        Run for the lifetime of a conversation so a long call never outlives
+        the cached_content it was started with.
+        """
+        while self.cache_name:
+            await self.refresh_cache()
+            await asyncio.sleep(self.CACHE_REFRESH_INTERVAL_SECONDS)
+
+    def get_cache_name(self) -> Optional[str]:
+        """Get the context cache name, if it will outlive a conversation."""
+        # A shared cache may have been refreshed by another session
+        expires_at = self._shared_upload.cache_expires_at if self._shared_upload else self._cache_expires_at
+        remaining = expires_at - time.monotonic()
+        if self.cache_name and remaining >= self.CACHE_MIN_REMAINING_SECONDS:
+            return self.cache_name
+        return None
+
     def get_file_uri(self) -> Optional[str]:
         """Get the Gemini file URI."""
         return self.file_uri
@@ -110,8 +471,27 @@ class BookProcessor:
         return self.file_uri is not None
 
     async def clear(self):
-        """Clear the current book and delete from Gemini."""
-        # Delete from Gemini if uploaded
+        """Clear the current book and delete it from Gemini and disk.
+
+        The Gemini file and cache are kept while other sessions share them.
+        The remote deletes and the local unlink are independent, so they run
+        concurrently.
+        """
+        deletes = [self._delete_local()]
+        if self._release_upload():
+            deletes += [self._delete_remote(), self._delete_cache()]
+        await asyncio.gather(*deletes, return_exceptions=True)
+
+        self.file_info = None
+        self.file_uri = None
+        self.mime_type = None
+        self.book_title = None
+        self._temp_file_path = None
+        self.cache_name = None
+        self._cache_expires_at = 0.0
+
+    async def _delete_remote(self):
+        """Delete the uploaded file from Gemini, if any."""
         if self.file_info:
             try:
                 file_name = self.file_info["file"]["name"]
@@ -120,15 +500,21 @@ class BookProcessor:
             except Exception as e:
                 logger.warning(f"Failed to delete file from Gemini: {e}")
 
-        # Delete temp file
-        if self._temp_file_path and os.path.exists(self._temp_file_path):
+    async def _delete_cache(self):
+        """Delete the context cache, if created."""
+        if self.cache_name:
             try:
-                os.unlink(self._temp_file_path)
+                await self.genai_client.aio.caches.delete(name=self.cache_name)
+                logger.info(f"Deleted context cache: {self.cache_name}")
             except Exception as e:
-                logger.warning(f"Failed to delete temp file: {e}")
+                logger.warning(f"Failed to delete context cache: {e}")
 
-        self.file_info = None
-        self.file_uri = None
-        self.mime_type = None
-        self.book_title = None
-        self._temp_file_path = None
+    async def _delete_local(self):
+        """Delete the temp file off the event loop; a missing file needs no stat call to detect."""
+        if self._temp_file_path:
+            try:
+                await asyncio.to_thread(os.unlink, self._temp_file_path)
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                logger.warning(f"Failed to delete temp file: {e}")
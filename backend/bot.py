@@ -1,14 +1,14 @@
 """Main Pipecat bot for book Q&A voice agent."""
 
+import copy
+import functools
 import os
 from typing import Dict, Optional
 
 from loguru import logger
 
-from pipecat.adapters.schemas.function_schema import FunctionSchema
-from pipecat.adapters.schemas.tools_schema import ToolsSchema
 from pipecat.audio.vad.silero import SileroVADAnalyzer
-from pipecat.audio.vad.vad_analyzer import VADParams
+from pipecat.audio.vad.vad_analyzer import VADAnalyzer, VADParams
 from pipecat.frames.frames import LLMRunFrame, OutputTransportMessageFrame
 from pipecat.pipeline.pipeline import Pipeline
 from pipecat.pipeline.runner import PipelineRunner
@@ -22,14 +22,20 @@ from pipecat.services.llm_service import FunctionCallParams
 from pipecat.transports.base_transport import TransportParams
 from pipecat.transports.smallwebrtc.connection import SmallWebRTCConnection
 
-from progress_tracker import STTProgressProcessor, LLMProgressProcessor, TTSStatusProcessor
+from llm_config import LLM_MODEL, SYSTEM_PROMPT_NO_FILE, SYSTEM_PROMPT_WITH_FILE, TOOLS
+from progress_tracker import (
+    STATUS_MESSAGES,
+    STTProgressProcessor,
+    LLMProgressProcessor,
+    TTSStatusProcessor,
+)
 from web_search import WebSearcher
 
 
 # Cached API clients (reused across connections to avoid connection overhead)
 _camb_client = None
 _google_client = None
-web_searcher: Optional[WebSearcher] = None
+_silero_model = None
 
 
 def get_camb_client():
@@ -42,6 +48,37 @@ def get_camb_client():
     return _camb_client
 
 
+def get_silero_model():
+    """Get or load the shared Silero VAD model."""
+    global _silero_model
+    if _silero_model is None:
+        logger.info("Loading shared Silero VAD model")
+        _silero_model = SileroVADAnalyzer()._model
+    return _silero_model
+
+
+class SharedSileroVADAnalyzer(SileroVADAnalyzer):
+    """Silero VAD analyzer that reuses the shared model's ONNX session.
+
+    Each analyzer gets a shallow copy of the model with its own reset state,
+    so only the immutable inference session is shared between connections.
+    """
+
+    def __init__(self, *, sample_rate: Optional[int] = None, params: Optional[VADParams] = None):
+        # Skip SileroVADAnalyzer.__init__, which would load a fresh model
+        VADAnalyzer.__init__(self, sample_rate=sample_rate, params=params)
+        self._model = copy.copy(get_silero_model())
+        self._model.reset_states()
+        self._last_reset_time = 0
+
+
+@functools.lru_cache(maxsize=1)
+def get_web_searcher() -> WebSearcher:
+    """Get the shared web searcher, created on first use once env vars are loaded."""
+    logger.info("Creating shared web searcher")
+    return WebSearcher()
+
+
 def create_tts_service(model: str = "mars-flash") -> CambTTSService:
     """Create a TTS service with shared API client."""
     tts = CambTTSService(
@@ -58,75 +95,31 @@ def create_stt_service() -> DeepgramSTTService:
     return DeepgramSTTService(api_key=os.getenv("DEEPGRAM_API_KEY"))
 
 
-def create_llm_service() -> GoogleLLMService:
-    """Create a fresh LLM service."""
+def create_llm_service(cache_name: Optional[str] = None) -> GoogleLLMService:
+    """Create a fresh LLM service.
+
+    Args:
+        cache_name: Optional Gemini cached content holding the system prompt,
+            tools, and uploaded document.
+    """
+    params = None
+    if cache_name:
+        params = GoogleLLMService.InputParams(extra={"cached_content": cache_name})
     llm = GoogleLLMService(
         api_key=os.getenv("GOOGLE_API_KEY"),
-        model="gemini-3-flash-preview",
+        model=LLM_MODEL,
+        params=params,
     )
     llm.register_function("search_web", search_web)
     return llm
 
 
-SYSTEM_PROMPT_WITH_FILE = """You are a helpful voice assistant that answers questions about the uploaded document.
-
-IMPORTANT RULES:
-1. Answer questions based on the document that has been uploaded. You have direct access to it.
-2. You have access to a search_web function - ONLY use it when the user explicitly asks about something not covered in the document, or asks you to look something up online.
-3. Keep responses concise (under 100 words) since they will be spoken aloud.
-4. Do not discuss topics completely unrelated to the document or its themes.
-5. If asked about something outside the document's scope, politely mention that and offer to search the web if relevant.
-6. Speak naturally as this is a voice conversation.
-
-CRITICAL - Your responses will be read aloud by text-to-speech. You MUST:
-- Never use asterisks (*), markdown formatting, or bullet points
-- Never use special characters like #, -, _, or similar
-- Never use parenthetical asides like (pause) or (laughs)
-- Write in plain, flowing sentences only
-- Spell out abbreviations and acronyms when first used
-- Use words like "first", "second", "third" instead of numbered lists
-"""
-
-SYSTEM_PROMPT_NO_FILE = """You are a helpful voice assistant. The user has not uploaded a document yet.
-
-Please ask the user to upload a document (PDF or text file) so you can answer questions about it.
-
-Keep responses concise and natural since they will be spoken aloud.
-
-CRITICAL - Your responses will be read aloud by text-to-speech. You MUST:
-- Never use asterisks (*), markdown formatting, or bullet points
-- Never use special characters like #, -, _, or similar
-- Never use parenthetical asides like (pause) or (laughs)
-- Write in plain, flowing sentences only
-"""
-
-
-def create_tools() -> ToolsSchema:
-    """Create the function calling tools."""
-    search_function = FunctionSchema(
-        name="search_web",
-        description="Search the web for information. Only use this when the user asks about something not in the document, or explicitly asks you to search online.",
-        properties={
-            "query": {
-                "type": "string",
-                "description": "The search query to look up on the web.",
-            },
-        },
-        required=["query"],
-    )
-    return ToolsSchema(standard_tools=[search_function])
-
-
 async def search_web(params: FunctionCallParams):
     """Handle web search function calls from the LLM."""
-    global web_searcher
-
     query = params.arguments.get("query", "")
     logger.info(f"Web search requested: {query}")
 
-    if web_searcher is None:
-        web_searcher = WebSearcher()
-
+    web_searcher = get_web_searcher()
     results = await web_searcher.search(query, num_results=3)
     formatted = web_searcher.format_results_for_llm(results)
 
@@ -140,6 +133,7 @@ async def run_bot(
     mime_type: Optional[str] = None,
     book_title: Optional[str] = None,
     tts_model: str = "mars-flash",
+    cache_name: Optional[str] = None,
 ):
     """Run the voice agent bot for a WebRTC connection.
 
@@ -149,6 +143,7 @@ async def run_bot(
         mime_type: Optional mime type of the uploaded file.
         book_title: Optional book title.
         tts_model: TTS model to use (mars-flash or mars-pro).
+        cache_name: Optional Gemini cached content for the uploaded document.
     """
     from pipecat.transports.smallwebrtc.transport import SmallWebRTCTransport
 
@@ -157,22 +152,28 @@ async def run_bot(
         params=TransportParams(
             audio_in_enabled=True,
             audio_out_enabled=True,
-            vad_analyzer=SileroVADAnalyzer(params=VADParams(stop_secs=0.3)),
+            vad_analyzer=SharedSileroVADAnalyzer(params=VADParams(stop_secs=0.3)),
         ),
     )
 
     # Create fresh service instances (with cached API clients for CAMB)
     stt = create_stt_service()
     tts = create_tts_service(tts_model)
-    llm = create_llm_service()
+    llm = create_llm_service(cache_name)
 
     logger.info(f"Using TTS model: {tts_model}")
 
-    # Create tools and context
-    tools = create_tools()
+    # Tools and context
+    tools = TOOLS
 
     # Build initial messages based on whether we have a file
-    if file_uri:
+    greeting_with_file = f"I've uploaded a document called '{book_title}'. Greet me briefly and let me know you're ready to answer questions about it."
+    if file_uri and cache_name:
+        # System prompt, tools, and document are already in the cached content
+        logger.info(f"Starting bot with cached file: {book_title} ({cache_name})")
+        messages = [{"role": "user", "content": greeting_with_file}]
+        tools = None
+    elif file_uri:
         logger.info(f"Starting bot with file: {book_title} ({file_uri})")
         messages = [
             {"role": "system", "content": SYSTEM_PROMPT_WITH_FILE},
@@ -181,7 +182,7 @@ async def run_bot(
                 "content": [
                     {
                         "type": "text",
-                        "text": f"I've uploaded a document called '{book_title}'. Greet me briefly and let me know you're ready to answer questions about it.",
+                        "text": greeting_with_file,
                     },
                     {
                         "type": "file_data",
@@ -200,7 +201,7 @@ async def run_bot(
             },
         ]
 
-    context = LLMContext(messages, tools)
+    context = LLMContext(messages, tools) if tools else LLMContext(messages)
     context_aggregator = LLMContextAggregatorPair(context)
 
     # Progress processors for status updates - split by position in pipeline
@@ -234,7 +235,7 @@ async def run_bot(
         logger.info("Client connected")
         # Send initial status
         await task.queue_frame(
-            OutputTransportMessageFrame(message={"type": "status", "status": "connected"})
+            OutputTransportMessageFrame(message=STATUS_MESSAGES["connected"])
         )
         # Trigger initial greeting
         await task.queue_frames([LLMRunFrame()])
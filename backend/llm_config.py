@@ -0,0 +1,64 @@
+"""LLM model, system prompts, and tool schema shared by the bot and book processor.
+
+Kept free of pipeline services so book uploads can build context caches
+without importing the whole voice pipeline.
+"""
+
+from pipecat.adapters.schemas.function_schema import FunctionSchema
+from pipecat.adapters.schemas.tools_schema import ToolsSchema
+
+
+LLM_MODEL = "gemini-3-flash-preview"
+
+
+SYSTEM_PROMPT_WITH_FILE = """You are a helpful voice assistant that answers questions about the uploaded document.
+
+IMPORTANT RULES:
+1. Answer questions based on the document that has been uploaded. You have direct access to it.
+2. You have access to a search_web function - ONLY use it when the user explicitly asks about something not covered in the document, or asks you to look something up online.
+3. Keep responses concise (under 100 words) since they will be spoken aloud.
+4. Do not discuss topics completely unrelated to the document or its themes.
+5. If asked about something outside the document's scope, politely mention that and offer to search the web if relevant.
+6. Speak naturally as this is a voice conversation.
+
+CRITICAL - Your responses will be read aloud by text-to-speech. You MUST:
+- Never use asterisks (*), markdown formatting, or bullet points
+- Never use special characters like #, -, _, or similar
+- Never use parenthetical asides like (pause) or (laughs)
+- Write in plain, flowing sentences only
+- Spell out abbreviations and acronyms when first used
+- Use words like "first", "second", "third" instead of numbered lists
+"""
+
+SYSTEM_PROMPT_NO_FILE = """You are a helpful voice assistant. The user has not uploaded a document yet.
+
+Please ask the user to upload a document (PDF or text file) so you can answer questions about it.
+
+Keep responses concise and natural since they will be spoken aloud.
+
+CRITICAL - Your responses will be read aloud by text-to-speech. You MUST:
+- Never use asterisks (*), markdown formatting, or bullet points
+- Never use special characters like #, -, _, or similar
+- Never use parenthetical asides like (pause) or (laughs)
+- Write in plain, flowing sentences only
+"""
+
+
+def create_tools() -> ToolsSchema:
+    """Create the function calling tools."""
+    search_function = FunctionSchema(
+        name="search_web",
+        description="Search the web for information. Only use this when the user asks about something not in the document, or explicitly asks you to search online.",
+        properties={
+            "query": {
+                "type": "string",
+                "description": "The search query to look up on the web.",
+            },
+        },
+        required=["query"],
+    )
+    return ToolsSchema(standard_tools=[search_function])
+
+
+# The tool schema is static, so build it once and share it across connections
+TOOLS = create_tools()
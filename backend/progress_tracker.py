@@ -1,7 +1,7 @@
 """Progress tracker processors for sending status updates to the frontend."""
 
 import time
-from typing import Optional
+from typing import Awaitable, Callable, Dict, Optional
 
 from loguru import logger
 
@@ -21,50 +21,77 @@ from pipecat.frames.frames import (
 from pipecat.processors.frame_processor import FrameProcessor, FrameDirection
 
 
-class STTProgressProcessor(FrameProcessor):
-    """Tracks STT progress - place after STT in pipeline.
+# Prebuilt payloads for text-less status updates, shared by every processor
+STATUS_MESSAGES = {
+    status: {"type": "status", "status": status}
+    for status in ("connected", "idle", "listening", "stt", "llm", "tts")
+}
 
-    Handles:
-    - InterimTranscriptionFrame: User is speaking
-    - TranscriptionFrame: Final transcription received
+
+FrameHandler = Callable[[Frame], Awaitable[None]]
+
+
+class ProgressProcessor(FrameProcessor):
+    """Base for processors that send progress messages to the frontend.
+
+    Subclasses register per-frame-type handlers in ``_handlers``, checked in
+    insertion order. The handler resolved for each concrete frame type is
+    cached, so frames are dispatched with one dict lookup instead of an
+    isinstance chain. Every frame is passed through after its handler runs.
     """
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self._user_message_id: int = 0
+        self._handlers: Dict[type, FrameHandler] = {}
+        self._dispatch: Dict[type, Optional[FrameHandler]] = {}
 
     async def process_frame(self, frame: Frame, direction: FrameDirection):
         await super().process_frame(frame, direction)
 
-        if isinstance(frame, InterimTranscriptionFrame):
-            # User is speaking - show listening state
-            await self._send_status("listening", frame.text)
-
-        elif isinstance(frame, TranscriptionFrame):
-            # Final transcription received - STT complete
-            self._user_message_id += 1
-            await self._send_status("stt", frame.text)
-            await self._send_log(f"STT: \"{frame.text[:50]}{'...' if len(frame.text) > 50 else ''}\"")
-            # Send user transcript with unique ID
-            await self._send_transcript("user", frame.text, final=True, message_id=self._user_message_id)
-            # Immediately transition to LLM status
-            await self._send_status("llm")
-            await self._send_log("Sending to LLM...")
+        frame_type = type(frame)
+        try:
+            handler = self._dispatch[frame_type]
+        except KeyError:
+            handler = self._resolve_handler(frame_type)
+
+        if handler is not None:
+            await handler(frame)
 
         # Always pass the frame through
         await self.push_frame(frame, direction)
 
-    async def _send_status(self, status: str, text: Optional[str] = None):
-        """Send a status update to the frontend."""
-        message = {"type": "status", "status": status}
-        if text:
-            message["text"] = text
-        logger.debug(f"Sending status: {status}")
+    def _resolve_handler(self, frame_type: type) -> Optional[FrameHandler]:
+        """Find and cache the handler for a frame type, honoring subclasses."""
+        handler = next(
+            (h for t, h in self._handlers.items() if issubclass(frame_type, t)),
+            None,
+        )
+        self._dispatch[frame_type] = handler
+        return handler
+
+    async def _emit(self, message: dict):
+        """Push a message to the frontend over the transport."""
         await self.push_frame(
             OutputTransportMessageFrame(message=message),
             FrameDirection.DOWNSTREAM,
         )
 
+    async def _send_status(self, status: str, text: Optional[str] = None, log: Optional[str] = None):
+        """Send a status update to the frontend.
+
+        A log line can ride along in the same message to save a transport send.
+        """
+        if text or log:
+            message = {"type": "status", "status": status}
+            if text:
+                message["text"] = text
+            if log:
+                message["log"] = log
+        else:
+            message = STATUS_MESSAGES[status]
+        logger.debug(f"Sending status: {status}")
+        await self._emit(message)
+
     async def _send_transcript(
         self,
         role: str,
@@ -83,46 +110,86 @@ class STTProgressProcessor(FrameProcessor):
         if message_id is not None:
             message["messageId"] = message_id
         logger.info(f"Sending transcript: role={role}, final={final}, text_len={len(text)}, messageId={message_id}")
-        await self.push_frame(
-            OutputTransportMessageFrame(message=message),
-            FrameDirection.DOWNSTREAM,
-        )
+        await self._emit(message)
 
     async def _send_log(self, text: str):
         """Send a log message to the frontend."""
-        await self.push_frame(
-            OutputTransportMessageFrame(message={"type": "log", "text": text}),
-            FrameDirection.DOWNSTREAM,
+        await self._emit({"type": "log", "text": text})
+
+
+class STTProgressProcessor(ProgressProcessor):
+    """Tracks STT progress - place after STT in pipeline.
+
+    Handles:
+    - InterimTranscriptionFrame: User is speaking
+    - TranscriptionFrame: Final transcription received
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._user_message_id: int = 0
+        self._handlers = {
+            InterimTranscriptionFrame: self._on_interim_transcription,
+            TranscriptionFrame: self._on_transcription,
+        }
+
+    async def _on_interim_transcription(self, frame: InterimTranscriptionFrame):
+        # User is speaking - show listening state
+        await self._send_status("listening", frame.text)
+
+    async def _on_transcription(self, frame: TranscriptionFrame):
+        # Final transcription received - STT complete
+        self._user_message_id += 1
+        await self._send_status(
+            "stt",
+            frame.text,
+            log=f"STT: \"{frame.text[:50]}{'...' if len(frame.text) > 50 else ''}\"",
         )
+        # Send user transcript with unique ID
+        await self._send_transcript("user", frame.text, final=True, message_id=self._user_message_id)
+        # Immediately transition to LLM status
+        await self._send_status("llm", log="Sending to LLM...")
 
 
-class LLMProgressProcessor(FrameProcessor):
+class LLMProgressProcessor(ProgressProcessor):
     """Tracks LLM progress - place after LLM in pipeline.
 
     Handles:
     - LLMFullResponseStartFrame: LLM started generating
     - LLMTextFrame: Streaming text chunks
     - LLMFullResponseEndFrame: LLM finished
+
+    Streaming updates are coalesced to roughly 30 per second; the final
+    transcript is always sent when the response ends.
     """
 
+    # Minimum seconds between streaming transcript updates
+    FLUSH_INTERVAL = 0.033
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self._assistant_text: str = ""
         self._assistant_message_id: int = 0
+        self._last_flush_ts: float = 0.0
+        self._handlers = {
+            LLMFullResponseStartFrame: self._on_response_start,
+            LLMTextFrame: self._on_text,
+            LLMFullResponseEndFrame: self._on_response_end,
+        }
 
-    async def process_frame(self, frame: Frame, direction: FrameDirection):
-        await super().process_frame(frame, direction)
-
-        if isinstance(frame, LLMFullResponseStartFrame):
-            # LLM started streaming response - start new message
-            self._assistant_text = ""
-            self._assistant_message_id += 1
-            await self._send_log("LLM streaming response...")
-
-        elif isinstance(frame, LLMTextFrame):
-            # Accumulate and stream assistant text
-            self._assistant_text += frame.text
-            # Send streaming update
+    async def _on_response_start(self, frame: LLMFullResponseStartFrame):
+        # LLM started streaming response - start new message
+        self._assistant_text = ""
+        self._assistant_message_id += 1
+        await self._send_log("LLM streaming response...")
+
+    async def _on_text(self, frame: LLMTextFrame):
+        # Accumulate and stream assistant text
+        self._assistant_text += frame.text
+        # Send streaming update, at most once per flush interval
+        now = time.monotonic()
+        if now - self._last_flush_ts >= self.FLUSH_INTERVAL:
+            self._last_flush_ts = now
             await self._send_transcript(
                 "assistant",
                 self._assistant_text,
@@ -130,118 +197,80 @@ class LLMProgressProcessor(FrameProcessor):
                 message_id=self._assistant_message_id
             )
 
-        elif isinstance(frame, LLMFullResponseEndFrame):
-            # LLM finished - mark message as final
-            if self._assistant_text:
-                await self._send_transcript(
-                    "assistant",
-                    self._assistant_text,
-                    final=True,
-                    message_id=self._assistant_message_id
-                )
-                await self._send_log(f"LLM complete: {len(self._assistant_text)} chars")
-                self._assistant_text = ""
-            await self._send_log("Sending to TTS...")
-
-        # Always pass the frame through
-        await self.push_frame(frame, direction)
-
-    async def _send_transcript(
-        self,
-        role: str,
-        text: str,
-        final: bool = True,
-        message_id: Optional[int] = None
-    ):
-        """Send a transcript update to the frontend."""
-        message = {
-            "type": "transcript",
-            "role": role,
-            "text": text,
-            "final": final,
-            "timestamp": int(time.time() * 1000),  # Unix timestamp in milliseconds
-        }
-        if message_id is not None:
-            message["messageId"] = message_id
-        logger.info(f"Sending transcript: role={role}, final={final}, text_len={len(text)}, messageId={message_id}")
-        await self.push_frame(
-            OutputTransportMessageFrame(message=message),
-            FrameDirection.DOWNSTREAM,
-        )
+    async def _on_response_end(self, frame: LLMFullResponseEndFrame):
+        # LLM finished - mark message as final
+        if self._assistant_text:
+            await self._send_transcript(
+                "assistant",
+                self._assistant_text,
+                final=True,
+                message_id=self._assistant_message_id
+            )
+            await self._send_log(f"LLM complete: {len(self._assistant_text)} chars")
+            self._assistant_text = ""
+        await self._send_log("Sending to TTS...")
 
-    async def _send_log(self, text: str):
-        """Send a log message to the frontend."""
-        await self.push_frame(
-            OutputTransportMessageFrame(message={"type": "log", "text": text}),
-            FrameDirection.DOWNSTREAM,
-        )
 
+class TTSStatusProcessor(ProgressProcessor):
+    """Processor to track TTS status and interruptions - place after TTS in pipeline.
 
-class TTSStatusProcessor(FrameProcessor):
-    """Processor to track TTS status and interruptions - place after TTS in pipeline."""
+    Repeated status updates are dropped, and TTSSpeakFrame logs are limited to
+    one per LLM response.
+    """
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self._is_speaking = False
+        self._last_status: Optional[str] = None
+        self._speak_logged = False
+        self._handlers = {
+            LLMFullResponseStartFrame: self._on_response_start,
+            StartInterruptionFrame: self._on_interruption,
+            TTSStartedFrame: self._on_tts_started,
+            TTSStoppedFrame: self._on_tts_stopped,
+            TTSSpeakFrame: self._on_tts_speak,
+        }
 
-    async def process_frame(self, frame: Frame, direction: FrameDirection):
-        await super().process_frame(frame, direction)
-
-        if isinstance(frame, StartInterruptionFrame):
-            # User interrupted the bot while it was speaking
-            if self._is_speaking:
-                self._is_speaking = False
-                logger.debug("Bot interrupted by user")
-                await self.push_frame(
-                    OutputTransportMessageFrame(message={"type": "status", "status": "idle"}),
-                    FrameDirection.DOWNSTREAM,
-                )
-                await self.push_frame(
-                    OutputTransportMessageFrame(message={"type": "log", "text": "Interrupted by user"}),
-                    FrameDirection.DOWNSTREAM,
-                )
-
-        elif isinstance(frame, TTSStartedFrame):
-            if not self._is_speaking:
-                self._is_speaking = True
-                logger.debug("TTS started frame detected")
-                # Send TTS status to frontend
-                await self.push_frame(
-                    OutputTransportMessageFrame(message={"type": "status", "status": "tts"}),
-                    FrameDirection.DOWNSTREAM,
-                )
-                await self.push_frame(
-                    OutputTransportMessageFrame(message={"type": "log", "text": "TTS speaking..."}),
-                    FrameDirection.DOWNSTREAM,
-                )
-
-        elif isinstance(frame, TTSStoppedFrame):
-            if self._is_speaking:
-                self._is_speaking = False
-                logger.debug("TTS stopped frame detected")
-                await self.push_frame(
-                    OutputTransportMessageFrame(message={"type": "status", "status": "idle"}),
-                    FrameDirection.DOWNSTREAM,
-                )
-                await self.push_frame(
-                    OutputTransportMessageFrame(message={"type": "log", "text": "Ready"}),
-                    FrameDirection.DOWNSTREAM,
-                )
-
-        elif isinstance(frame, TTSSpeakFrame):
-            # TTS is about to speak this text - also set status if not already speaking
-            if not self._is_speaking:
-                self._is_speaking = True
-                logger.debug("TTS speak frame detected - setting speaking state")
-                await self.push_frame(
-                    OutputTransportMessageFrame(message={"type": "status", "status": "tts"}),
-                    FrameDirection.DOWNSTREAM,
-                )
+    async def _on_response_start(self, frame: LLMFullResponseStartFrame):
+        # New response - allow one more TTSSpeakFrame log
+        self._speak_logged = False
+
+    async def _on_interruption(self, frame: StartInterruptionFrame):
+        # User interrupted the bot while it was speaking
+        if self._is_speaking:
+            self._is_speaking = False
+            logger.debug("Bot interrupted by user")
+            await self._set_status("idle", log="Interrupted by user")
+
+    async def _on_tts_started(self, frame: TTSStartedFrame):
+        if not self._is_speaking:
+            self._is_speaking = True
+            logger.debug("TTS started frame detected")
+            # Send TTS status to frontend
+            await self._set_status("tts", log="TTS speaking...")
+
+    async def _on_tts_stopped(self, frame: TTSStoppedFrame):
+        if self._is_speaking:
+            self._is_speaking = False
+            logger.debug("TTS stopped frame detected")
+            await self._set_status("idle", log="Ready")
+
+    async def _on_tts_speak(self, frame: TTSSpeakFrame):
+        # TTS is about to speak this text - also set status if not already speaking
+        if not self._is_speaking:
+            self._is_speaking = True
+            logger.debug("TTS speak frame detected - setting speaking state")
+            await self._set_status("tts")
+        if not self._speak_logged:
+            self._speak_logged = True
             text_preview = frame.text[:30] + "..." if len(frame.text) > 30 else frame.text
             logger.debug(f"TTS speak frame: {text_preview}")
-            await self.push_frame(
-                OutputTransportMessageFrame(message={"type": "log", "text": f"TTS: \"{text_preview}\""}),
-                FrameDirection.DOWNSTREAM,
-            )
-
-        await self.push_frame(frame, direction)
+            await self._send_log(f"TTS: \"{text_preview}\"")
+
+    async def _set_status(self, status: str, log: Optional[str] = None):
+        """Send a status update unless it repeats the last one sent."""
+        if self._last_status != status:
+            self._last_status = status
+            await self._send_status(status, log=log)
+        elif log:
+            await self._send_log(log)
@@ -1,8 +1,15 @@
 """FastAPI server with WebRTC endpoints for the book Q&A voice agent."""
 
+import asyncio
+import hashlib
 import os
+import sys
+import time
 import uuid
-from typing import Dict, Optional
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Awaitable, Callable, Generic, Optional, Set, Tuple, TypeVar
 
 import uvicorn
 from dotenv import load_dotenv
@@ -11,15 +18,35 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import RedirectResponse
 from fastapi.staticfiles import StaticFiles
 from loguru import logger
+from starlette.responses import Response
+from starlette.types import Scope
 
 from pipecat.transports.smallwebrtc.connection import IceServer, SmallWebRTCConnection
 
 from book_processor import BookProcessor
-from bot import run_bot
+from bot import get_silero_model, get_web_searcher, run_bot
+from web_search import close_http_session
 
 load_dotenv()
 
-app = FastAPI(title="Book Q&A Voice Agent")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm up shared resources before the first request and release them on shutdown."""
+    # Load shared models, open the search cache, and fill the session pool
+    get_silero_model()
+    await get_web_searcher().open_disk_cache()
+    session_pool_task = asyncio.create_task(fill_session_pool())
+    try:
+        yield
+    finally:
+        # Stop refilling the pool, then close the search cache and shared network clients
+        session_pool_task.cancel()
+        await get_web_searcher().close()
+        await close_http_session()
+
+
+app = FastAPI(title="Book Q&A Voice Agent", lifespan=lifespan)
 
 # CORS for frontend
 app.add_middleware(
@@ -30,16 +57,202 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Store active WebRTC connections
-connections: Dict[str, SmallWebRTCConnection] = {}
+V = TypeVar("V")
+
+
+class StoreFullError(Exception):
+    """Raised when an LRUStore is full and every entry is pinned."""
+
+
+class LRUStore(Generic[V]):
+    """Dict-like store bounded by size and, optionally, idle time.
+
+    Reads refresh an entry. When the store is full, or an entry has been idle
+    longer than the TTL, the least recently used entry is evicted and passed
+    to on_evict. Entries removed explicitly with pop() are not. Entries for
+    which pinned() is true are never evicted; adding to a store that is full
+    of pinned entries raises StoreFullError.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: Optional[float] = None,
+        on_evict: Optional[Callable[[str, V], None]] = None,
+        pinned: Optional[Callable[[V], bool]] = None,
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._on_evict = on_evict
+        self._pinned = pinned
+        self._items: "OrderedDict[str, Tuple[float, V]]" = OrderedDict()
+
+    def _is_pinned(self, value: V) -> bool:
+        return self._pinned is not None and self._pinned(value)
+
+    def _evict(self, key: str, value: V):
+        logger.info(f"Evicting {key}")
+        if self._on_evict:
+            self._on_evict(key, value)
+
+    def _expire(self):
+        """Evict idle entries, which sit at the front in last-access order.
+
+        Pinned entries are in use, so they are refreshed instead.
+        """
+        if self.ttl is None:
+            return
+        now = time.monotonic()
+        cutoff = now - self.ttl
+        while self._items:
+            key, (last_access, value) = next(iter(self._items.items()))
+            if last_access > cutoff:
+                break
+            if self._is_pinned(value):
+                self._items[key] = (now, value)
+                self._items.move_to_end(key)
+                continue
+            del self._items[key]
+            self._evict(key, value)
+
+    def _evict_lru(self) -> bool:
+        """Evict the least recently used unpinned entry, if there is one."""
+        for key, (_, value) in self._items.items():
+            if not self._is_pinned(value):
+                del self._items[key]
+                self._evict(key, value)
+                return True
+        return False
+
+    def get(self, key: str, default: Optional[V] = None) -> Optional[V]:
+        self._expire()
+        item = self._items.get(key)
+        if item is None:
+            return default
+        self._items[key] = (time.monotonic(), item[1])
+        self._items.move_to_end(key)
+        return item[1]
+
+    def pop(self, key: str, default: Optional[V] = None) -> Optional[V]:
+        item = self._items.pop(key, None)
+        return default if item is None else item[1]
+
+    def __getitem__(self, key: str) -> V:
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: str, value: V):
+        self._expire()
+        if key not in self._items and len(self._items) >= self.maxsize and not self._evict_lru():
+            raise StoreFullError(f"Store is full ({self.maxsize} entries in use)")
+        self._items[key] = (time.monotonic(), value)
+        self._items.move_to_end(key)
+
+    def full(self) -> bool:
+        """Whether adding a new key would need an eviction."""
+        self._expire()
+        return len(self._items) >= self.maxsize
+
+    def __contains__(self, key: str) -> bool:
+        self._expire()
+        return key in self._items
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+@dataclass(slots=True)
+class Session:
+    """A user session and the book uploaded to it."""
+
+    book_processor: BookProcessor = field(default_factory=BookProcessor)
+    file_uri: Optional[str] = None
+    mime_type: Optional[str] = None
+    book_title: Optional[str] = None
+    # Open connections and uploads in progress; a session in use is never evicted
+    in_use: int = 0
+
+
+# Limits on tracked connections and sessions; idle sessions expire after an hour
+MAX_CONNECTIONS = 1024
+MAX_SESSIONS = 1024
+SESSION_TTL_SECONDS = 3600
+
+
+# References to fire-and-forget tasks, so they aren't garbage-collected mid-run
+pending_tasks: Set["asyncio.Task[None]"] = set()
+
+
+def spawn(coro: Awaitable[None]) -> "asyncio.Task[None]":
+    """Run a coroutine in the background, keeping a reference until it finishes."""
+    task = asyncio.ensure_future(coro)
+    pending_tasks.add(task)
+    task.add_done_callback(pending_tasks.discard)
+    return task
+
+
+def clear_session(session_id: str, session: Session):
+    """Free the uploaded book of a session evicted from the store."""
+    spawn(session.book_processor.clear())
+
+
+# Store active WebRTC connections; new offers are refused rather than
+# disconnecting live calls when full, and closed ones remove themselves
+connections: LRUStore[SmallWebRTCConnection] = LRUStore(MAX_CONNECTIONS, pinned=lambda _: True)
+
+# Store sessions with their book processors; sessions in use are never evicted
+sessions: LRUStore[Session] = LRUStore(
+    MAX_SESSIONS, SESSION_TTL_SECONDS, on_evict=clear_session, pinned=lambda s: s.in_use > 0
+)
 
-# Store sessions with their book processors
-sessions: Dict[str, Dict] = {}
+# Pre-built sessions so /api/session and /start don't pay for construction under bursts
+SESSION_POOL_SIZE = 32
+session_pool: "asyncio.Queue[Tuple[str, Session]]" = asyncio.Queue(maxsize=SESSION_POOL_SIZE)
 
 # STUN server for WebRTC NAT traversal
 ice_servers = [IceServer(urls="stun:stun.l.google.com:19302")]
 
 
+async def iter_upload(file: UploadFile) -> AsyncIterator[bytes]:
+    """Yield an uploaded file in fixed-size chunks without buffering it whole."""
+    while chunk := await file.read(BookProcessor.CHUNK_SIZE):
+        yield chunk
+
+
+async def hash_upload(file: UploadFile) -> str:
+    """Return the SHA-256 hex digest of an uploaded file, then rewind it."""
+    digest = hashlib.sha256()
+    async for chunk in iter_upload(file):
+        digest.update(chunk)
+    await file.seek(0)
+    return digest.hexdigest()
+
+
+async def fill_session_pool():
+    """Keep the session pool topped up; blocks while the pool is full."""
+    while True:
+        await session_pool.put((str(uuid.uuid4()), Session()))
+
+
+def new_session() -> str:
+    """Register a new session, taking a pre-built one from the pool if available.
+
+    Raises:
+        HTTPException: 503 if every stored session is in use.
+    """
+    try:
+        session_id, session = session_pool.get_nowait()
+    except asyncio.QueueEmpty:
+        session_id, session = str(uuid.uuid4()), Session()
+    try:
+        sessions[session_id] = session
+    except StoreFullError:
+        raise HTTPException(status_code=503, detail="Server is at capacity, try again later")
+    return session_id
+
+
 @app.get("/")
 async def root():
     """Redirect root to the client."""
@@ -55,13 +268,7 @@ async def health():
 @app.post("/api/session")
 async def create_session():
     """Create a new session for a user."""
-    session_id = str(uuid.uuid4())
-    sessions[session_id] = {
-        "book_processor": BookProcessor(),
-        "file_uri": None,
-        "mime_type": None,
-        "book_title": None,
-    }
+    session_id = new_session()
     logger.info(f"Created session: {session_id}")
     return {"session_id": session_id}
 
@@ -82,23 +289,30 @@ async def upload_book(session_id: str, file: UploadFile = File(...)):
 
     # Validate file type
     filename = file.filename or "unknown"
-    if not (filename.lower().endswith(".pdf") or filename.lower().endswith(".txt")):
+    if os.path.splitext(filename)[1].lower() not in BookProcessor.SUPPORTED_TYPES:
         raise HTTPException(
             status_code=400,
             detail="Only PDF and TXT files are supported"
         )
 
+    session = sessions[session_id]
+    session.in_use += 1
     try:
-        content = await file.read()
-        processor = sessions[session_id]["book_processor"]
+        processor = session.book_processor
+
+        # Hash the already-received body so duplicate books reuse an earlier upload;
+        # unknown-size uploads are hashed while spooling instead
+        digest = None
+        if file.size is not None and file.size <= BookProcessor.MAX_FILE_SIZE:
+            digest = await hash_upload(file)
 
-        # Upload to Gemini File API
-        result = await processor.process_file(content, filename)
+        # Stream straight to Gemini File API (spooled to disk only if the size is unknown)
+        result = await processor.process_stream(iter_upload(file), filename, size=file.size, digest=digest)
 
         # Store file info in session
-        sessions[session_id]["file_uri"] = result["file_uri"]
-        sessions[session_id]["mime_type"] = result["mime_type"]
-        sessions[session_id]["book_title"] = result["filename"]
+        session.file_uri = result["file_uri"]
+        session.mime_type = result["mime_type"]
+        session.book_title = result["filename"]
 
         logger.info(f"Session {session_id}: Uploaded '{filename}' to Gemini")
 
@@ -113,6 +327,8 @@ async def upload_book(session_id: str, file: UploadFile = File(...)):
     except Exception as e:
         logger.error(f"Error processing file: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to upload: {str(e)}")
+    finally:
+        session.in_use -= 1
 
 
 @app.post("/api/session/{session_id}/clear-book")
@@ -121,12 +337,12 @@ async def clear_book(session_id: str):
     if session_id not in sessions:
         raise HTTPException(status_code=404, detail="Session not found")
 
-    processor = sessions[session_id]["book_processor"]
-    await processor.clear()
+    session = sessions[session_id]
+    await session.book_processor.clear()
 
-    sessions[session_id]["file_uri"] = None
-    sessions[session_id]["mime_type"] = None
-    sessions[session_id]["book_title"] = None
+    session.file_uri = None
+    session.mime_type = None
+    session.book_title = None
 
     logger.info(f"Session {session_id}: Cleared book")
     return {"success": True}
@@ -135,16 +351,7 @@ async def clear_book(session_id: str):
 @app.post("/start")
 async def start(request_data: dict = {}):
     """RTVI protocol: Create a new session."""
-    session_id = str(uuid.uuid4())
-
-    # Initialize session if not exists
-    if session_id not in sessions:
-        sessions[session_id] = {
-            "book_processor": BookProcessor(),
-            "file_uri": None,
-            "mime_type": None,
-            "book_title": None,
-        }
+    session_id = new_session()
 
     result = {"sessionId": session_id}
     if request_data.get("enableDefaultIceServers"):
@@ -162,13 +369,7 @@ async def session_proxy(
 ):
     """RTVI protocol: Proxy requests to session endpoints."""
     if session_id not in sessions:
-        # Create session on the fly
-        sessions[session_id] = {
-            "book_processor": BookProcessor(),
-            "file_uri": None,
-            "mime_type": None,
-            "book_title": None,
-        }
+        raise HTTPException(status_code=404, detail="Session not found")
 
     if path.endswith("api/offer"):
         return await offer(request_data, background_tasks, session_id)
@@ -198,10 +399,13 @@ async def offer(
     file_uri = None
     mime_type = None
     book_title = None
-    if session_id and session_id in sessions:
-        file_uri = sessions[session_id].get("file_uri")
-        mime_type = sessions[session_id].get("mime_type")
-        book_title = sessions[session_id].get("book_title")
+    cache_name = None
+    session = sessions.get(session_id) if session_id else None
+    if session is not None:
+        file_uri = session.file_uri
+        mime_type = session.mime_type
+        book_title = session.book_title
+        cache_name = session.book_processor.get_cache_name()
 
     if pc_id and pc_id in connections:
         conn = connections[pc_id]
@@ -211,33 +415,65 @@ async def offer(
             restart_pc=request_data.get("restart_pc", False),
         )
     else:
+        # Refuse new calls rather than disconnecting live ones
+        if connections.full():
+            raise HTTPException(status_code=503, detail="Server is at capacity, try again later")
+
         conn = SmallWebRTCConnection(ice_servers)
         await conn.initialize(sdp=request_data["sdp"], type=request_data["type"])
 
+        if session is not None:
+            session.in_use += 1
+
+        # Keep the cached book alive for as long as this conversation lasts
+        cache_keepalive = spawn(session.book_processor.keep_cache_alive()) if cache_name else None
+
         @conn.event_handler("closed")
         async def handle_closed(c: SmallWebRTCConnection):
             connections.pop(c.pc_id, None)
-            # Clean up session only if no book uploaded (keep sessions with books for reconnect)
-            if session_id and session_id in sessions:
-                if not sessions[session_id].get("file_uri"):
-                    sessions.pop(session_id, None)
-                    logger.info(f"Session {session_id} cleaned up (no book)")
-                else:
-                    logger.info(f"Session {session_id} kept (has book)")
+            if cache_keepalive is not None:
+                cache_keepalive.cancel()
+            # Sessions are kept for reconnects; once unused, their idle time starts now
+            if session is not None:
+                session.in_use -= 1
+                sessions.get(session_id)
             logger.info(f"Connection {c.pc_id} closed, active connections: {len(connections)}, sessions: {len(sessions)}")
 
-        background_tasks.add_task(run_bot, conn, file_uri, mime_type, book_title, tts_model)
+        background_tasks.add_task(run_bot, conn, file_uri, mime_type, book_title, tts_model, cache_name)
 
     answer = conn.get_answer()
-    connections[answer["pc_id"]] = conn
+    try:
+        connections[answer["pc_id"]] = conn
+    except StoreFullError:
+        # Lost a race for the last free slot while initializing
+        await conn.disconnect()
+        raise HTTPException(status_code=503, detail="Server is at capacity, try again later")
     logger.info(f"Active connections: {len(connections)}, sessions: {len(sessions)}")
     return answer
 
 
+class CachedStaticFiles(StaticFiles):
+    """Static files with Cache-Control headers suited to a Vite build.
+
+    Files under assets/ have content-hashed names and are cached forever;
+    everything else (index.html) is revalidated on each load.
+    """
+
+    ASSETS_PREFIX = "assets" + os.sep
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        response = await super().get_response(path, scope)
+        if path.startswith(self.ASSETS_PREFIX):
+            response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        else:
+            response.headers["Cache-Control"] = "no-cache"
+        return response
+
+
 # Mount static files for frontend (if exists)
 frontend_path = os.path.join(os.path.dirname(__file__), "..", "frontend", "dist")
 if os.path.exists(frontend_path):
-    app.mount("/", StaticFiles(directory=frontend_path, html=True), name="static")
+    app.mount("/", CachedStaticFiles(directory=frontend_path, html=True), name="static")
 
 
 def main():
@@ -245,7 +481,15 @@ def main():
     port = int(os.getenv("PORT", 7860))
     print(f"Starting Book Q&A Voice Agent server on port {port}...")
     print(f"API docs available at http://localhost:{port}/docs")
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    uvicorn.run(
+        app,
+        host="0.0.0.0",
+        port=port,
+        # uvloop and httptools ship with uvicorn[standard]; uvloop has no Windows build
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
+        workers=1,
+    )
 
 
 if __name__ == "__main__":
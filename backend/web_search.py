@@ -1,42 +1,186 @@
 """Web search functionality using Exa API."""
 
+import asyncio
 import os
-from typing import List, Dict, Any
+import random
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import List, Dict, Optional, Tuple
 
+import aiohttp
+import orjson
+from aiolimiter import AsyncLimiter
 from loguru import logger
 
-try:
-    from exa_py import Exa
-except ImportError:
-    Exa = None
-    logger.warning("exa-py not installed. Web search disabled.")
+
+EXA_SEARCH_URL = "https://api.exa.ai/search"
+
+# One formatted search hit: index, title, url, text
+_TEMPLATE = "{0}. {1}\n   URL: {2}\n   {3}"
+
+# Whole-batch templates for the common small result counts, taking the
+# flattened (title, url, text) fields of every result in order
+_MAX_TEMPLATED_RESULTS = 8
+_BATCH_TEMPLATES = {
+    n: "\n\n".join(
+        _TEMPLATE.format(i + 1, f"{{{3 * i}}}", f"{{{3 * i + 1}}}", f"{{{3 * i + 2}}}")
+        for i in range(n)
+    )
+    for n in range(1, _MAX_TEMPLATED_RESULTS + 1)
+}
+
+# Words of a query, used to normalize cache keys
+_WORD_PATTERN = re.compile(r"\w+")
+
+# Shared result returned on every search while unconfigured; callers must not mutate it
+_UNCONFIGURED: Tuple[Dict[str, str], ...] = ({"error": "Web search is not configured"},)
+_UNCONFIGURED_MESSAGE = "Search error: Web search is not configured"
+_NO_RESULTS_MESSAGE = "No results found."
+
+
+@dataclass(slots=True)
+class SearchResult:
+    """A single web search hit."""
+
+    title: str
+    url: str
+    text: str
+
+    def to_dict(self) -> Dict[str, str]:
+        """JSON-serializable form of the result."""
+        return asdict(self)
+
+
+# Shared HTTP session so TCP+TLS connections are reused across searches
+_http_session: Optional[aiohttp.ClientSession] = None
+
+
+def get_http_session() -> aiohttp.ClientSession:
+    """Get or create the shared HTTP session. Must be called from the event loop."""
+    global _http_session
+    if _http_session is None or _http_session.closed:
+        _http_session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit_per_host=64, keepalive_timeout=60),
+            timeout=aiohttp.ClientTimeout(total=30),
+        )
+    return _http_session
+
+
+async def close_http_session():
+    """Close the shared HTTP session, if open."""
+    global _http_session
+    if _http_session is not None:
+        await _http_session.close()
+        _http_session = None
+
+
+class SearchDiskCache:
+    """SQLite-backed search cache that survives process restarts.
+
+    All methods block; call them through asyncio.to_thread.
+    """
+
+    def __init__(self, path: str, ttl: float):
+        """Open (or create) the cache database and drop expired rows.
+
+        Args:
+            path: SQLite database file.
+            ttl: Seconds a stored result stays fresh.
+        """
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS searches (key TEXT PRIMARY KEY, ts REAL, results BLOB)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS searches_ts ON searches (ts)")
+            self._conn.execute("DELETE FROM searches WHERE ts < ?", (time.time() - ttl,))
+
+    def get(self, key: str) -> Optional[List["SearchResult"]]:
+        """Get fresh results for a key, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT results FROM searches WHERE key = ? AND ts >= ?",
+                (key, time.time() - self.ttl),
+            ).fetchone()
+        if row is None:
+            return None
+        return [SearchResult(**result) for result in orjson.loads(row[0])]
+
+    def put(self, key: str, results: List["SearchResult"]):
+        """Store results for a key."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO searches (key, ts, results) VALUES (?, ?, ?)",
+                (key, time.time(), orjson.dumps(results)),
+            )
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
 
 
 class WebSearcher:
-    """Handles web search using Exa API."""
+    """Handles web search using Exa API.
+
+    Successful results are cached in memory per (query, num_results) for
+    CACHE_TTL seconds, so repeated questions skip the network round trip.
+    Concurrent identical searches share a single in-flight request.
+    Results are also written through to a SQLite cache at SEARCH_CACHE_PATH,
+    so popular queries stay warm across restarts for DISK_CACHE_TTL seconds.
+    The cache is opened off the event loop by open_disk_cache() (at server
+    startup, or on first search) and closed by close().
+    """
+
+    # Seconds a cached search result stays fresh
+    CACHE_TTL = 300
+
+    # Max cached queries before the oldest is evicted
+    CACHE_MAX_ENTRIES = 256
+
+    # Seconds a result persisted to disk stays fresh
+    DISK_CACHE_TTL = 24 * 3600
+
+    # Max concurrent searches issued by search_many
+    MAX_CONCURRENT_SEARCHES = 8
+
+    # Client-side request rate, kept a little under Exa's limit
+    MAX_REQUESTS_PER_SECOND = 4
+
+    # Attempts per search when Exa rate-limits or fails server-side
+    MAX_ATTEMPTS = 4
+    RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+    # Upper bound on any single retry wait, to keep voice turns responsive
+    MAX_RETRY_DELAY = 5.0
 
     def __init__(self, api_key: str = None):
-        """Initialize the web searcher.
+        """Initialize the web searcher. Must be called from the event loop.
 
         Args:
             api_key: Exa API key. If not provided, reads from EXA_API_KEY env var.
         """
         self.api_key = api_key or os.getenv("EXA_API_KEY")
-        self._client = None
+        self._cache: Dict[Tuple[str, int], Tuple[float, List[SearchResult]]] = {}
+        self._inflight: Dict[Tuple[str, int], "asyncio.Task[List[SearchResult]]"] = {}
+        self._search_slots = asyncio.Semaphore(self.MAX_CONCURRENT_SEARCHES)
+        self._limiter = AsyncLimiter(self.MAX_REQUESTS_PER_SECOND, 1)
+        self._disk_cache_task: "Optional[asyncio.Task[Optional[SearchDiskCache]]]" = None
 
-        if Exa is None:
-            logger.warning("Exa not available - web search will be disabled")
-        elif not self.api_key:
+        # Resolve the shared HTTP session once; None means search is disabled
+        self._client: Optional[aiohttp.ClientSession] = None
+        if self.api_key:
+            self._client = get_http_session()
+        else:
             logger.warning("EXA_API_KEY not set - web search will be disabled")
 
-    @property
-    def client(self) -> "Exa":
-        """Lazy initialization of Exa client."""
-        if self._client is None and Exa is not None and self.api_key:
-            self._client = Exa(api_key=self.api_key)
-        return self._client
-
-    async def search(self, query: str, num_results: int = 3) -> List[Dict[str, Any]]:
+    async def search(self, query: str, num_results: int = 3) -> List[SearchResult]:
         """Search the web using Exa.
 
         Args:
@@ -44,38 +188,200 @@ class WebSearcher:
             num_results: Number of results to return.
 
         Returns:
-            List of search results with title, url, and text.
+            List of search results, or a single error dict on failure.
         """
-        if self.client is None:
+        if self._client is None:
             logger.warning("Web search not available")
-            return [{"error": "Web search is not configured"}]
+            return _UNCONFIGURED
+
+        key = self._cache_key(query, num_results)
+        cached = self._cache.get(key)
+        if cached is not None and time.monotonic() - cached[0] < self.CACHE_TTL:
+            logger.info(f"Web search cache hit for: {query}")
+            return cached[1]
+
+        # Shield so one cancelled caller doesn't cancel the search for the others
+        return await asyncio.shield(self._start_search(key, query, num_results))
 
+    async def search_many(self, queries: List[str], num_results: int = 3) -> List[List[SearchResult]]:
+        """Run several searches concurrently, at most MAX_CONCURRENT_SEARCHES at a time.
+
+        Duplicate queries share one request through the cache and in-flight
+        deduplication.
+
+        Args:
+            queries: The search queries.
+            num_results: Number of results to return per query.
+
+        Returns:
+            One result list per query, in the same order.
+        """
+        async def search_one(query: str) -> List[SearchResult]:
+            async with self._search_slots:
+                return await self.search(query, num_results)
+
+        return await asyncio.gather(*(search_one(query) for query in queries))
+
+    def prefetch(self, query: str, num_results: int = 3):
+        """Start a search speculatively so a later identical search() finds it ready.
+
+        The result lands in the in-memory cache, or is joined while still in
+        flight. Prefetches that no search() asks for simply expire from the
+        cache; they are never persisted to disk, and they are skipped when the
+        rate limiter has no spare capacity so they never delay real searches.
+
+        Args:
+            query: The likely search query.
+            num_results: Number of results to return.
+        """
+        if self._client is None or not self._limiter.has_capacity():
+            return
+
+        key = self._cache_key(query, num_results)
+        cached = self._cache.get(key)
+        if cached is not None and time.monotonic() - cached[0] < self.CACHE_TTL:
+            return
+
+        logger.debug(f"Prefetching web search for: {query}")
+        self._start_search(key, query, num_results, persist=False)
+
+    async def open_disk_cache(self) -> Optional[SearchDiskCache]:
+        """Open the SQLite cache off the event loop; later calls share the first open.
+
+        Returns:
+            The disk cache, or None if search is disabled or the cache can't be opened.
+        """
+        if self._client is None:
+            return None
+        if self._disk_cache_task is None:
+            self._disk_cache_task = asyncio.ensure_future(asyncio.to_thread(self._connect_disk_cache))
+        return await asyncio.shield(self._disk_cache_task)
+
+    def _connect_disk_cache(self) -> Optional[SearchDiskCache]:
+        """Open the SQLite cache at SEARCH_CACHE_PATH. Blocks."""
         try:
-            logger.info(f"Searching web for: {query}")
+            return SearchDiskCache(os.getenv("SEARCH_CACHE_PATH", "search_cache.db"), self.DISK_CACHE_TTL)
+        except sqlite3.Error as e:
+            logger.warning(f"Search disk cache unavailable: {e}")
+            return None
 
-            # Use search_and_contents for text snippets
-            response = self.client.search_and_contents(
-                query,
-                num_results=num_results,
-                text={"max_characters": 500},
-            )
+    async def close(self):
+        """Close the SQLite cache, if open."""
+        task, self._disk_cache_task = self._disk_cache_task, None
+        if task is None:
+            return
+        disk_cache = await task
+        if disk_cache is not None:
+            await asyncio.to_thread(disk_cache.close)
+
+    def _cache_key(self, query: str, num_results: int) -> Tuple[str, int]:
+        """Cache key for a query, ignoring case, punctuation, and spacing."""
+        return " ".join(_WORD_PATTERN.findall(query.lower())), num_results
 
-            results = []
-            for result in response.results:
-                results.append({
-                    "title": result.title,
-                    "url": result.url,
-                    "text": result.text[:500] if result.text else "",
-                })
+    def _start_search(
+        self, key: Tuple[str, int], query: str, num_results: int, persist: bool = True
+    ) -> "asyncio.Task[List[SearchResult]]":
+        """Get the in-flight search for a key, starting one if needed."""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._search_uncached(key, query, num_results, persist))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            logger.info(f"Joining in-flight web search for: {query}")
+        return task
 
-            logger.info(f"Found {len(results)} results")
-            return results
+    async def _search_uncached(
+        self, key: Tuple[str, int], query: str, num_results: int, persist: bool = True
+    ) -> List[SearchResult]:
+        """Load results from the disk cache, or fetch them from Exa and cache them on success.
+
+        Fetched results are written through to disk only if persist is set.
+        """
+        disk_key = f"{num_results}:{key[0]}"
+        disk_cache = await self.open_disk_cache()
+        if disk_cache is not None:
+            try:
+                results = await asyncio.to_thread(disk_cache.get, disk_key)
+            except (sqlite3.Error, TypeError, ValueError) as e:
+                logger.warning(f"Search disk cache read failed: {e}")
+                results = None
+            if results is not None:
+                logger.info(f"Web search disk cache hit for: {query}")
+                self._store(key, results)
+                return results
 
+        try:
+            results = await self._fetch(query, num_results)
         except Exception as e:
             logger.error(f"Web search error: {e}")
             return [{"error": str(e)}]
 
-    def format_results_for_llm(self, results: List[Dict[str, Any]]) -> str:
+        self._store(key, results)
+        if persist and disk_cache is not None:
+            try:
+                await asyncio.to_thread(disk_cache.put, disk_key, results)
+            except sqlite3.Error as e:
+                logger.warning(f"Search disk cache write failed: {e}")
+        return results
+
+    async def _fetch(self, query: str, num_results: int) -> List[SearchResult]:
+        """Run a search against the Exa API.
+
+        Requests are shaped by a token-bucket limiter, and rate-limit or
+        server errors are retried with jittered exponential backoff.
+        """
+        logger.info(f"Searching web for: {query}")
+
+        for attempt in range(self.MAX_ATTEMPTS):
+            async with self._limiter:
+                # Request text snippets along with the results
+                async with self._client.post(
+                    EXA_SEARCH_URL,
+                    headers={"x-api-key": self.api_key},
+                    json={
+                        "query": query,
+                        "numResults": num_results,
+                        "contents": {"text": {"maxCharacters": 500}},
+                    },
+                ) as response:
+                    last_attempt = attempt == self.MAX_ATTEMPTS - 1
+                    if response.status not in self.RETRY_STATUSES or last_attempt:
+                        response.raise_for_status()
+                        data = orjson.loads(await response.read())
+                        break
+                    delay = self._retry_delay(attempt, response.headers.get("Retry-After"))
+                    logger.warning(f"Exa returned {response.status}, retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+        results = [
+            SearchResult(
+                result.get("title") or "",
+                result.get("url", ""),
+                result.get("text") or "",
+            )
+            for result in data.get("results", ())
+        ]
+
+        logger.info(f"Found {len(results)} results")
+        return results
+
+    def _retry_delay(self, attempt: int, retry_after: Optional[str]) -> float:
+        """Backoff before the next attempt, honoring Retry-After when given."""
+        try:
+            delay = float(retry_after)
+        except (TypeError, ValueError):
+            delay = 0.5 * 2 ** attempt + random.random() * 0.5
+        return min(delay, self.MAX_RETRY_DELAY)
+
+    def _store(self, key: Tuple[str, int], results: List[SearchResult]):
+        """Cache results, evicting the oldest entry when the cache is full."""
+        self._cache[key] = (time.monotonic(), results)
+        if len(self._cache) > self.CACHE_MAX_ENTRIES:
+            oldest = min(self._cache, key=lambda k: self._cache[k][0])
+            del self._cache[oldest]
+
+    def format_results_for_llm(self, results: List[SearchResult]) -> str:
         """Format search results for LLM consumption.
 
         Args:
@@ -85,17 +391,22 @@ class WebSearcher:
             Formatted string for LLM.
         """
         if not results:
-            return "No results found."
+            return _NO_RESULTS_MESSAGE
+
+        if results is _UNCONFIGURED:
+            return _UNCONFIGURED_MESSAGE
 
-        if "error" in results[0]:
-            return f"Search error: {results[0]['error']}"
+        first = results[0]
+        if isinstance(first, dict) and first.keys() == {"error"}:
+            return f"Search error: {first['error']}"
 
-        formatted = []
-        for i, result in enumerate(results, 1):
-            formatted.append(
-                f"{i}. {result['title']}\n"
-                f"   URL: {result['url']}\n"
-                f"   {result['text']}"
+        template = _BATCH_TEMPLATES.get(len(results))
+        if template is not None:
+            return template.format(
+                *[field for result in results for field in (result.title, result.url, result.text)]
             )
 
-        return "\n\n".join(formatted)
+        return "\n\n".join(
+            _TEMPLATE.format(i, result.title, result.url, result.text)
+            for i, result in enumerate(results, 1)
+        )
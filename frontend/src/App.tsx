@@ -15,20 +15,30 @@ function App() {
   const [currentText, setCurrentText] = useState<string>('');
   const [ttsModel, setTtsModel] = useState<TTSModel>('mars-flash');
 
+  // Create a new server session, returning its ID
+  const createSession = useCallback(async (): Promise<string | null> => {
+    try {
+      const response = await fetch('/api/session', { method: 'POST' });
+      const data = await response.json();
+      setSessionId(data.session_id);
+      return data.session_id;
+    } catch (error) {
+      console.error('Failed to create session:', error);
+      return null;
+    }
+  }, []);
+
   // Create session on mount
   useEffect(() => {
-    const createSession = async () => {
-      try {
-        const response = await fetch('/api/session', { method: 'POST' });
-        const data = await response.json();
-        setSessionId(data.session_id);
-      } catch (error) {
-        console.error('Failed to create session:', error);
-      }
-    };
-
     createSession();
-  }, []);
+  }, [createSession]);
+
+  // The server dropped an idle session (and its book); start over with a new one
+  const handleSessionExpired = useCallback(async () => {
+    console.warn('Session expired, creating a new one');
+    setBookInfo(null);
+    return createSession();
+  }, [createSession]);
 
   // Handle status changes
   const handleStatusChange = useCallback((status: PipelineStatus) => {
@@ -77,6 +87,7 @@ function App() {
     onStatusChange: handleStatusChange,
     onTranscript: handleTranscript,
     onLog: handleLog,
+    onSessionExpired: handleSessionExpired,
   });
 
   // Handle book upload success
@@ -117,6 +128,7 @@ function App() {
             <BookUpload
               sessionId={sessionId}
               onUploadSuccess={handleUploadSuccess}
+              onSessionExpired={handleSessionExpired}
               disabled={isConnected}
             />
 
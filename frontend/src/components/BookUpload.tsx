@@ -1,8 +1,9 @@
-import { useState, useRef } from 'react';
+import { useState, useRef, useEffect } from 'react';
 
 interface BookUploadProps {
   sessionId: string | null;
   onUploadSuccess: (filename: string) => void;
+  onSessionExpired: () => Promise<string | null>;
   disabled?: boolean;
 }
 
@@ -12,7 +13,7 @@ interface UploadState {
   uploadedFile: string | null;
 }
 
-export function BookUpload({ sessionId, onUploadSuccess, disabled }: BookUploadProps) {
+export function BookUpload({ sessionId, onUploadSuccess, onSessionExpired, disabled }: BookUploadProps) {
   const [state, setState] = useState<UploadState>({
     isUploading: false,
     error: null,
@@ -21,6 +22,11 @@ export function BookUpload({ sessionId, onUploadSuccess, disabled }: BookUploadP
   const [isDragging, setIsDragging] = useState(false);
   const fileInputRef = useRef<HTMLInputElement>(null);
 
+  // A new session starts without a book
+  useEffect(() => {
+    setState((s) => ({ ...s, uploadedFile: null }));
+  }, [sessionId]);
+
   const handleFile = async (file: File) => {
     if (!sessionId) {
       setState((s) => ({ ...s, error: 'No session ID' }));
@@ -46,6 +52,11 @@ export function BookUpload({ sessionId, onUploadSuccess, disabled }: BookUploadP
         body: formData,
       });
 
+      if (response.status === 404) {
+        await onSessionExpired();
+        throw new Error('Your session expired. Please upload the book again.');
+      }
+
       if (!response.ok) {
         const error = await response.json();
         throw new Error(error.detail || 'Upload failed');
@@ -97,9 +108,13 @@ export function BookUpload({ sessionId, onUploadSuccess, disabled }: BookUploadP
     if (!sessionId) return;
 
     try {
-      await fetch(`/api/session/${sessionId}/clear-book`, {
+      const response = await fetch(`/api/session/${sessionId}/clear-book`, {
         method: 'POST',
       });
+      if (response.status === 404) {
+        // The expired session's book is already gone
+        await onSessionExpired();
+      }
       setState({ isUploading: false, error: null, uploadedFile: null });
     } catch (error) {
       console.error('Failed to clear book:', error);
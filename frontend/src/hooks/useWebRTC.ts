@@ -22,6 +22,8 @@ export interface UseWebRTCOptions {
   onStatusChange?: (status: PipelineStatus) => void;
   onTranscript?: (message: TranscriptMessage) => void;
   onLog?: (log: LogMessage) => void;
+  // Called when the server no longer knows the session; resolves to a fresh session ID
+  onSessionExpired?: () => Promise<string | null>;
 }
 
 export interface UseWebRTCReturn {
@@ -44,6 +46,7 @@ export function useWebRTC({
   onStatusChange,
   onTranscript,
   onLog,
+  onSessionExpired,
 }: UseWebRTCOptions): UseWebRTCReturn {
   const [connectionStatus, setConnectionStatus] = useState<ConnectionStatus>('disconnected');
   const [pipelineStatus, setPipelineStatus] = useState<PipelineStatus>('idle');
@@ -58,13 +61,15 @@ export function useWebRTC({
   const onStatusChangeRef = useRef(onStatusChange);
   const onTranscriptRef = useRef(onTranscript);
   const onLogRef = useRef(onLog);
+  const onSessionExpiredRef = useRef(onSessionExpired);
 
   // Keep refs updated
   useEffect(() => {
     onStatusChangeRef.current = onStatusChange;
     onTranscriptRef.current = onTranscript;
     onLogRef.current = onLog;
-  }, [onStatusChange, onTranscript, onLog]);
+    onSessionExpiredRef.current = onSessionExpired;
+  }, [onStatusChange, onTranscript, onLog, onSessionExpired]);
 
   // Handle incoming messages from the server
   const handleMessage = useCallback((event: MessageEvent) => {
@@ -76,6 +81,10 @@ export function useWebRTC({
         const status = data.status as PipelineStatus;
         setPipelineStatus(status);
         onStatusChangeRef.current?.(status);
+        // Status updates may carry a log line to save a separate message
+        if (data.log) {
+          onLogRef.current?.({ text: data.log, timestamp: Date.now() });
+        }
       } else if (data.type === 'transcript') {
         // Handle streaming transcripts
         // Create composite ID using role to prevent collisions between user and assistant messages
@@ -194,20 +203,23 @@ export function useWebRTC({
       });
 
       // Send offer to server
-      const offerUrl = sessionId
-        ? `/sessions/${sessionId}/api/offer`
-        : '/api/offer';
-
-      const response = await fetch(offerUrl, {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({
-          sdp: pc.localDescription?.sdp,
-          type: pc.localDescription?.type,
-          pc_id: pcIdRef.current,
-          tts_model: ttsModel,
-        }),
-      });
+      const sendOffer = (id: string | null) =>
+        fetch(id ? `/sessions/${id}/api/offer` : '/api/offer', {
+          method: 'POST',
+          headers: { 'Content-Type': 'application/json' },
+          body: JSON.stringify({
+            sdp: pc.localDescription?.sdp,
+            type: pc.localDescription?.type,
+            pc_id: pcIdRef.current,
+            tts_model: ttsModel,
+          }),
+        });
+
+      let response = await sendOffer(sessionId);
+      if (response.status === 404 && onSessionExpiredRef.current) {
+        // Session expired on the server; retry once with a fresh one
+        response = await sendOffer(await onSessionExpiredRef.current());
+      }
 
       const answer = await response.json();
       pcIdRef.current = answer.pc_id;